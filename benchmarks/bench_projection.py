@@ -0,0 +1,57 @@
+"""
+Invariant drift versus dt, with and without projection, for conservative runs.
+
+    python -m benchmarks.bench_projection --t-max 200
+
+core: max |E - E0| / E0.
+3d:   max |E - E0| / E0 and max |L_z - L_z0| / |L_z0|.
+Projection is applied every step (k=1) and every 10 steps (k=10).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.core import Params, simulate
+from src.pendulum_3D.equations import Params3D, energy_spherical, angular_momentum_z
+from src.pendulum_3D.simulate import simulate_3d
+
+
+def drift_core(t_max, dt, k):
+    p = Params(theta0=2.0, t_max=t_max, dt=dt, project_every=k)
+    t0 = time.perf_counter()
+    _, _, _, E = simulate(p)
+    elapsed = time.perf_counter() - t0
+    return elapsed, np.max(np.abs(E - E[0])) / E[0], None
+
+
+def drift_3d(t_max, dt, k):
+    p = Params3D(theta0=0.8, theta_dot0=0.25, phi_dot0=1.7, t_max=t_max, dt=dt, project_every=k)
+    t0 = time.perf_counter()
+    _, theta, _, theta_dot, phi_dot, *_ = simulate_3d(p)
+    elapsed = time.perf_counter() - t0
+    E = energy_spherical(theta, theta_dot, phi_dot, p)
+    Lz = angular_momentum_z(theta, phi_dot)
+    return (elapsed,
+            np.max(np.abs(E - E[0])) / E[0],
+            np.max(np.abs(Lz - Lz[0])) / abs(Lz[0]))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--t-max", type=float, default=200.0)
+    ap.add_argument("--dts", type=float, nargs="+", default=[0.005, 0.01, 0.02, 0.05, 0.1, 0.2])
+    args = ap.parse_args()
+
+    for label, run in (("core", drift_core), ("3d", drift_3d)):
+        print(f"\n{label}  (t_max={args.t_max})")
+        print(f"{'dt':>7} {'k':>4} {'time (s)':>9} {'max dE/E0':>11} {'max dLz/Lz0':>12}")
+        for dt in args.dts:
+            for k in (0, 1, 10):
+                elapsed, dE, dLz = run(args.t_max, dt, k)
+                lz = f"{dLz:>12.2e}" if dLz is not None else f"{'-':>12}"
+                print(f"{dt:>7.3f} {k if k else 'off':>4} {elapsed:>9.3f} {dE:>11.2e} {lz}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Throughput / latency of the local simulation server under N concurrent clients.
+
+    python -m benchmarks.bench_server --clients 1 4 16 --t-max 20
+
+Each round starts N clients at once. Every client asks for a distinct run
+(cache miss), then the same run again (cache hit). Reported per round:
+median/max time to first chunk, wall time, and samples streamed per second.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from src.server import SimulationServer, stream_simulation
+
+
+async def one_client(port, params, model, chunk_size):
+    t0 = time.perf_counter()
+    first = None
+    n = 0
+    async for chunk in stream_simulation("127.0.0.1", port, params, model, chunk_size):
+        if first is None:
+            first = time.perf_counter() - t0
+        n += len(chunk["t"])
+    return first, n
+
+
+async def run_round(port, n_clients, params_for, model, chunk_size):
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(
+        one_client(port, params_for(k), model, chunk_size) for k in range(n_clients)
+    ))
+    wall = time.perf_counter() - t0
+    ttfc = np.array([r[0] for r in results])
+    samples = sum(r[1] for r in results)
+    return np.median(ttfc), ttfc.max(), wall, samples / wall
+
+
+async def main_async(args):
+    server = SimulationServer(port=0, workers=args.workers)
+    await server.start()
+    print(f"model={args.model} t_max={args.t_max} dt={args.dt} chunk={args.chunk}")
+    print(f"{'clients':>7} {'cache':>5} {'ttfc med (ms)':>14} {'ttfc max (ms)':>14} "
+          f"{'wall (s)':>9} {'samples/s':>12}")
+
+    try:
+        for n_clients in args.clients:
+            # distinct theta0 per client (and per round) so the first pass misses the cache
+            def params_for(k, n_clients=n_clients):
+                return {"theta0": 0.1 + 0.01 * k + 0.001 * n_clients,
+                        "t_max": args.t_max, "dt": args.dt}
+
+            for label in ("miss", "hit"):
+                med, worst, wall, rate = await run_round(
+                    server.port, n_clients, params_for, args.model, args.chunk)
+                print(f"{n_clients:>7} {label:>5} {1e3 * med:>14.1f} {1e3 * worst:>14.1f} "
+                      f"{wall:>9.2f} {rate:>12.0f}")
+    finally:
+        await server.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--model", choices=["core", "3d"], default="core")
+    ap.add_argument("--t-max", type=float, default=20.0)
+    ap.add_argument("--dt", type=float, default=0.001)
+    ap.add_argument("--chunk", type=int, default=2000)
+    ap.add_argument("--workers", type=int, default=None)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
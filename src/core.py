@@ -13,6 +13,7 @@ class Params:
     gamma: float = 0.0   # 1/s damping coefficient (using 2*gamma convention)
     A: float = 0.0       # rad/s^2 driving amplitude
     wd: float = 2.0      # rad/s driving angular frequency
+    project_every: int = 0  # project back onto the initial energy every k steps (0 = off)
 
 
 def derivs(t: float, y: np.ndarray, p: Params) -> np.ndarray:
@@ -40,18 +41,71 @@ def energy(theta: np.ndarray, omega: np.ndarray, p: Params) -> np.ndarray:
     # energy per unit mass (m cancels): E = 1/2 (L^2 omega^2) + gL(1 - cos theta)
     return 0.5*(p.L**2)*(omega**2) + p.g*p.L*(1.0 - np.cos(theta))
 
-def simulate(p: Params):
-    n = int(np.floor(p.t_max / p.dt)) + 1
-    t = np.linspace(0.0, p.t_max, n)
+def project_energy(y: np.ndarray, E0: float, p: Params, iters: int = 3) -> np.ndarray:
+    # orthogonal projection of (theta, omega) onto the surface E = E0 (Newton steps along grad E)
+    y = np.array(y, dtype=float)
+    for _ in range(iters):
+        theta, omega = y
+        grad = np.array([p.g * p.L * np.sin(theta), p.L**2 * omega])
+        norm2 = grad @ grad
+        if norm2 == 0.0:
+            break
+        y -= (energy(theta, omega, p) - E0) / norm2 * grad
+    return y
 
-    y = np.zeros((n, 2), dtype=float)
-    y[0, 0] = p.theta0
-    y[0, 1] = p.omega0
+def check_projection(p: Params) -> None:
+    if p.project_every < 0:
+        raise ValueError("project_every must be >= 0")
+    if p.project_every and (p.gamma != 0.0 or p.A != 0.0):
+        raise ValueError("Energy projection needs a conservative run (gamma = 0, A = 0)")
 
-    for i in range(n - 1):
-        y[i+1] = rk4_step(t[i], y[i], p.dt, p)
+def simulate(p: Params):
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    t, y = simulate_span(p, np.array([p.theta0, p.omega0], dtype=float), 0, n - 1)
 
     theta = y[:, 0]
     omega = y[:, 1]
     E = energy(theta, omega, p)
     return t, theta, omega, E
+
+def simulate_span(p: Params, y0: np.ndarray, i0: int, i1: int):
+    # RK4 from grid index i0 (state y0) to i1 inclusive, on the same grid as simulate
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    step = p.t_max / (n - 1) if n > 1 else 0.0
+    t = np.arange(i0, i1 + 1) * step
+    if n > 1 and i1 == n - 1:
+        t[-1] = p.t_max
+
+    y = np.zeros((i1 - i0 + 1, 2), dtype=float)
+    y[0] = y0
+
+    check_projection(p)
+    k = p.project_every
+    E0 = energy(p.theta0, p.omega0, p)
+
+    for i in range(i1 - i0):
+        y[i+1] = rk4_step(t[i], y[i], p.dt, p)
+        # count steps on the global grid so chunked runs project at the same samples
+        if k and (i0 + i + 1) % k == 0:
+            y[i+1] = project_energy(y[i+1], E0, p)
+
+    return t, y
+
+def simulate_chunks(p: Params, chunk_size: int = 1000):
+    # same trajectory as simulate, yielded as (t, theta, omega, E) pieces of
+    # at most chunk_size samples so long runs never live in memory at once
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    i1 = min(chunk_size, n) - 1
+    t, y = simulate_span(p, np.array([p.theta0, p.omega0], dtype=float), 0, i1)
+
+    while True:
+        theta = y[:, 0]
+        omega = y[:, 1]
+        yield t, theta, omega, energy(theta, omega, p)
+
+        if i1 >= n - 1:
+            return
+        # restart from this chunk's last sample, which the next chunk drops
+        i0, i1 = i1, min(i1 + chunk_size, n - 1)
+        t, y = simulate_span(p, y[-1], i0, i1)
+        t, y = t[1:], y[1:]
@@ -23,6 +23,9 @@ class Params3D:
     t_max: float = 10.0         # s
     dt: float = 0.01            # s
 
+    # Invariant projection (conservative runs only)
+    project_every: int = 0      # restore E and L_z every k steps (0 = off)
+
 
 def derivs_spherical(t: float, y: np.ndarray, p: Params3D) -> np.ndarray:
     """
@@ -71,3 +74,11 @@ def energy_spherical(theta: np.ndarray,
     T = 0.5 * (p.L**2) * (theta_dot**2 + (np.sin(theta)**2) * (phi_dot**2))
     V = p.g * p.L * (1.0 - np.cos(theta))
     return T + V
+
+
+def angular_momentum_z(theta: np.ndarray, phi_dot: np.ndarray) -> np.ndarray:
+    """
+    Vertical angular momentum per unit m L^2: L_z = sin²θ · phi_dot.
+    Conserved together with E when gamma = A = 0.
+    """
+    return np.sin(theta)**2 * phi_dot
@@ -1,5 +1,6 @@
 import numpy as np
-from .equations import Params3D, derivs_spherical, xyz_from_angles
+from .equations import (Params3D, derivs_spherical, xyz_from_angles,
+                        energy_spherical, angular_momentum_z)
 
 
 def rk4_step_3d(t: float, y: np.ndarray, dt: float, p: Params3D) -> np.ndarray:
@@ -10,15 +11,43 @@ def rk4_step_3d(t: float, y: np.ndarray, dt: float, p: Params3D) -> np.ndarray:
     return y + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
 
 
-def simulate_3d(p: Params3D):
-    n = int(np.floor(p.t_max / p.dt)) + 1
-    t = np.linspace(0.0, p.t_max, n)
+def project_invariants_3d(y: np.ndarray, E0: float, Lz0: float, p: Params3D,
+                          iters: int = 3) -> np.ndarray:
+    """
+    Orthogonal projection of the state onto {E = E0, L_z = Lz0}:
+    Gauss-Newton steps y -= G⁺ (c(y) - c0), with G the 2x4 Jacobian of (E, L_z).
+    The minimum-norm least-squares solve also covers a rank-deficient G.
+    """
+    y = np.array(y, dtype=float)
+    for _ in range(iters):
+        theta, phi, theta_dot, phi_dot = y
+        sin_th = np.sin(theta)
+        cos_th = np.cos(theta)
 
-    y = np.zeros((n, 4), dtype=float)
-    y[0] = np.array([p.theta0, p.phi0, p.theta_dot0, p.phi_dot0], dtype=float)
+        r = np.array([
+            energy_spherical(theta, theta_dot, phi_dot, p) - E0,
+            angular_momentum_z(theta, phi_dot) - Lz0,
+        ])
+        G = np.array([
+            [p.L**2 * sin_th * cos_th * phi_dot**2 + p.g * p.L * sin_th,
+             0.0, p.L**2 * theta_dot, p.L**2 * sin_th**2 * phi_dot],
+            [2.0 * sin_th * cos_th * phi_dot, 0.0, 0.0, sin_th**2],
+        ])
+        y -= np.linalg.lstsq(G, r, rcond=None)[0]
+    return y
 
-    for i in range(n - 1):
-        y[i + 1] = rk4_step_3d(t[i], y[i], p.dt, p)
+
+def check_projection_3d(p: Params3D) -> None:
+    if p.project_every < 0:
+        raise ValueError("project_every must be >= 0")
+    if p.project_every and (p.gamma != 0.0 or p.A != 0.0):
+        raise ValueError("Invariant projection needs a conservative run (gamma = 0, A = 0)")
+
+
+def simulate_3d(p: Params3D):
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    y0 = np.array([p.theta0, p.phi0, p.theta_dot0, p.phi_dot0], dtype=float)
+    t, y = simulate_3d_span(p, y0, 0, n - 1)
 
     theta = y[:, 0]
     phi = y[:, 1]
@@ -27,3 +56,54 @@ def simulate_3d(p: Params3D):
 
     x, y_, z = xyz_from_angles(theta, phi, p.L)
     return t, theta, phi, theta_dot, phi_dot, x, y_, z
+
+
+def simulate_3d_span(p: Params3D, y0: np.ndarray, i0: int, i1: int):
+    # RK4 from grid index i0 (state y0) to i1 inclusive, on the same grid as simulate_3d
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    step = p.t_max / (n - 1) if n > 1 else 0.0
+    t = np.arange(i0, i1 + 1) * step
+    if n > 1 and i1 == n - 1:
+        t[-1] = p.t_max
+
+    y = np.zeros((i1 - i0 + 1, 4), dtype=float)
+    y[0] = y0
+
+    check_projection_3d(p)
+    k = p.project_every
+    E0 = energy_spherical(p.theta0, p.theta_dot0, p.phi_dot0, p)
+    Lz0 = angular_momentum_z(p.theta0, p.phi_dot0)
+
+    for i in range(i1 - i0):
+        y[i + 1] = rk4_step_3d(t[i], y[i], p.dt, p)
+        # count steps on the global grid so chunked runs project at the same samples
+        if k and (i0 + i + 1) % k == 0:
+            y[i + 1] = project_invariants_3d(y[i + 1], E0, Lz0, p)
+
+    return t, y
+
+
+def simulate_3d_chunks(p: Params3D, chunk_size: int = 1000):
+    """
+    Same trajectory as simulate_3d, yielded as
+    (t, theta, phi, theta_dot, phi_dot, x, y, z) pieces of at most chunk_size samples.
+    """
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    i1 = min(chunk_size, n) - 1
+    y0 = np.array([p.theta0, p.phi0, p.theta_dot0, p.phi_dot0], dtype=float)
+    t, y = simulate_3d_span(p, y0, 0, i1)
+
+    while True:
+        theta = y[:, 0]
+        phi = y[:, 1]
+        theta_dot = y[:, 2]
+        phi_dot = y[:, 3]
+        x, y_, z = xyz_from_angles(theta, phi, p.L)
+        yield t, theta, phi, theta_dot, phi_dot, x, y_, z
+
+        if i1 >= n - 1:
+            return
+        # restart from this chunk's last sample, which the next chunk drops
+        i0, i1 = i1, min(i1 + chunk_size, n - 1)
+        t, y = simulate_3d_span(p, y[-1], i0, i1)
+        t, y = t[1:], y[1:]
@@ -0,0 +1,360 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import multiprocessing
+from collections import OrderedDict
+import dataclasses
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+
+from src.core import Params, simulate_span, energy, check_projection
+from src.pendulum_3D.equations import Params3D, xyz_from_angles
+from src.pendulum_3D.simulate import simulate_3d_span, check_projection_3d
+
+
+# Local simulation service.
+#
+#   POST /simulate   {"model": "core" | "3d", "params": {...}, "chunk_size": 1000}
+#   GET  /health
+#
+# /simulate answers with a chunked HTTP response (application/x-ndjson): one JSON
+# object per trajectory chunk, e.g. {"t": [...], "theta": [...], ...}, streamed as
+# soon as each chunk is integrated. Integrations run in a worker pool so
+# concurrent clients do not block each other; finished runs are kept, already
+# encoded, in an in-process LRU cache keyed by (model, params, chunk_size) and
+# bounded by total bytes.
+
+MODELS = {
+    "core": (Params, ("t", "theta", "omega", "E")),
+    "3d": (Params3D, ("t", "theta", "phi", "theta_dot", "phi_dot", "x", "y", "z")),
+}
+
+DEFAULT_CHUNK = 1000
+MAX_CHUNK = 100_000
+MAX_SAMPLES = 10_000_000
+
+
+def _initial_state(model: str, p) -> np.ndarray:
+    if model == "core":
+        return np.array([p.theta0, p.omega0], dtype=float)
+    return np.array([p.theta0, p.phi0, p.theta_dot0, p.phi_dot0], dtype=float)
+
+
+def _compute_chunk(model: str, p, y0: np.ndarray, i0: int, i1: int, drop_first: bool):
+    # worker-side: integrate one span and return (last state, ndjson line)
+    if model == "core":
+        t, y = simulate_span(p, y0, i0, i1)
+    else:
+        t, y = simulate_3d_span(p, y0, i0, i1)
+    y_last = y[-1].copy()
+    if drop_first:
+        t, y = t[1:], y[1:]
+    return y_last, _encode(_fields(model, p, t, y))
+
+
+def _fields(model: str, p, t: np.ndarray, y: np.ndarray) -> dict:
+    if model == "core":
+        theta, omega = y[:, 0], y[:, 1]
+        return {"t": t, "theta": theta, "omega": omega, "E": energy(theta, omega, p)}
+    theta, phi, theta_dot, phi_dot = y.T
+    x, y_, z = xyz_from_angles(theta, phi, p.L)
+    return {"t": t, "theta": theta, "phi": phi, "theta_dot": theta_dot,
+            "phi_dot": phi_dot, "x": x, "y": y_, "z": z}
+
+
+def _encode(fields: dict) -> bytes:
+    return (json.dumps({k: v.tolist() for k, v in fields.items()}) + "\n").encode()
+
+
+class ResultCache:
+    """
+    LRU of finished runs stored as their encoded NDJSON lines, bounded by the
+    total number of bytes held. Hits are streamed without re-encoding.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, lines: list) -> None:
+        size = sum(len(line) for line in lines)
+        if size > self.max_bytes:
+            return
+        if key in self._data:
+            self.nbytes -= sum(len(line) for line in self._data.pop(key))
+        self._data[key] = lines
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, old = self._data.popitem(last=False)
+            self.nbytes -= sum(len(line) for line in old)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SimulationServer:
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 8765,
+                 executor: Executor | None = None,
+                 workers: int | None = None,
+                 cache_bytes: int = 256 * 2**20):
+        self.host = host
+        self.port = port
+        if executor is None:
+            # spawn, not fork: forked workers would inherit the listening and client
+            # sockets, so closing a connection here would never reach the client
+            executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        self.executor = executor
+        self.cache = ResultCache(cache_bytes)
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0 picks a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---- HTTP plumbing ----
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await _read_request(reader)
+            if method == "GET" and path == "/health":
+                await _send_json(writer, 200, {"status": "ok", "cached": len(self.cache)})
+            elif method == "POST" and path == "/simulate":
+                await self._simulate(writer, body)
+            else:
+                await _send_json(writer, 404, {"error": f"no route for {method} {path}"})
+        except ValueError as e:
+            await _send_json(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _simulate(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        model, p, n, chunk_size = _parse_simulate(body)
+        key = (model, p, chunk_size)
+
+        cached = self.cache.get(key)
+        await _start_chunked(writer, "hit" if cached is not None else "miss")
+
+        if cached is not None:
+            for line in cached:
+                await _send_chunk(writer, line)
+            await _end_chunked(writer)
+            return
+
+        loop = asyncio.get_running_loop()
+        # stop collecting once the run can no longer fit in the cache
+        keep = True
+        lines = []
+        size = 0
+
+        y0 = _initial_state(model, p)
+        i0, i1 = 0, min(chunk_size, n) - 1
+        drop_first = False
+        while True:
+            y0, line = await loop.run_in_executor(
+                self.executor, _compute_chunk, model, p, y0, i0, i1, drop_first)
+            await _send_chunk(writer, line)
+            if keep:
+                size += len(line)
+                keep = size <= self.cache.max_bytes
+                if keep:
+                    lines.append(line)
+                else:
+                    lines.clear()
+            if i1 >= n - 1:
+                break
+            # restart from the previous chunk's last sample, dropped from the output
+            i0, i1 = i1, min(i1 + chunk_size, n - 1)
+            drop_first = True
+
+        await _end_chunked(writer)
+        if keep:
+            self.cache.put(key, lines)
+
+
+def _parse_simulate(body: bytes):
+    try:
+        req = json.loads(body or b"{}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(req, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    model = req.get("model", "core")
+    if not isinstance(model, str) or model not in MODELS:
+        raise ValueError(f"Unknown model: '{model}'")
+    cls, _ = MODELS[model]
+
+    # coerce JSON numbers to each field's type (float, or int for project_every)
+    params = req.get("params", {})
+    if not isinstance(params, dict):
+        raise ValueError("params must be a JSON object")
+    types = {f.name: type(f.default) for f in dataclasses.fields(cls)}
+    for k, v in params.items():
+        if types.get(k) is int and (isinstance(v, bool) or not isinstance(v, int)):
+            raise ValueError(f"Invalid params: {k} must be an integer, got {v!r}")
+    try:
+        p = cls(**{k: types.get(k, float)(v) for k, v in params.items()})
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"Invalid params: {e}")
+    if not (np.isfinite(p.dt) and np.isfinite(p.t_max)) or p.dt <= 0 or p.t_max < 0:
+        raise ValueError("Invalid params: need finite dt > 0 and t_max >= 0")
+    steps = p.t_max / p.dt
+    if not np.isfinite(steps) or steps + 1 > MAX_SAMPLES:
+        raise ValueError(f"Run too long: t_max / dt = {steps:.3g} (max {MAX_SAMPLES} samples)")
+    n = int(np.floor(steps)) + 1
+    # fail before the 200 header is sent rather than inside a worker
+    (check_projection if model == "core" else check_projection_3d)(p)
+
+    chunk_size = req.get("chunk_size", DEFAULT_CHUNK)
+    if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or not 1 <= chunk_size <= MAX_CHUNK:
+        raise ValueError(f"chunk_size must be an integer in [1, {MAX_CHUNK}]")
+    return model, p, n, chunk_size
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise ValueError(f"Malformed request line: '{request_line}'")
+    method, path, _ = parts
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", "0"))
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, body
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+    data = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        "Connection: close\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+
+
+async def _start_chunked(writer: asyncio.StreamWriter, cache_status: str) -> None:
+    writer.write(
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: application/x-ndjson\r\n"
+        "Transfer-Encoding: chunked\r\n"
+        f"X-Cache: {cache_status}\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+
+async def _send_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+    await writer.drain()
+
+
+async def _end_chunked(writer: asyncio.StreamWriter) -> None:
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+# ---- client side (for notebooks / dashboards / the benchmark) ----
+async def stream_simulation(host: str,
+                            port: int,
+                            params: dict,
+                            model: str = "core",
+                            chunk_size: int = DEFAULT_CHUNK):
+    """
+    Async generator yielding one dict of numpy arrays per streamed chunk.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        body = json.dumps({"model": model, "params": params, "chunk_size": chunk_size}).encode()
+        writer.write(
+            "POST /simulate HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+        status = (await reader.readline()).decode("latin-1").split()
+        while (await reader.readline()).strip():
+            pass  # skip headers
+        if len(status) < 2 or status[1] != "200":
+            raise RuntimeError((await reader.read()).decode(errors="replace"))
+
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            data = await reader.readexactly(size)
+            await reader.readexactly(2)  # trailing CRLF
+            yield {k: np.asarray(v) for k, v in json.loads(data).items()}
+    finally:
+        writer.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local pendulum simulation server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--cache-mb", type=int, default=256, help="cache budget in MB")
+    args = ap.parse_args()
+
+    async def run():
+        server = SimulationServer(args.host, args.port, workers=args.workers,
+                                  cache_bytes=args.cache_mb * 2**20)
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+from collections import deque
+import numpy as np
+
+from src.core import Params, simulate_chunks
+from src.pendulum_3D.equations import Params3D, energy_spherical
+from src.pendulum_3D.simulate import simulate_3d_chunks
+
+
+class WelchPSD:
+    """
+    Welch power spectral density accumulated over a stream of samples.
+    Only the unfinished tail (< nperseg samples), the running sum of segment
+    periodograms and, optionally, the last `spectrogram_frames` segment spectra
+    are kept, so memory is independent of the run length.
+    Defaults follow scipy.signal.welch: periodic Hann window, 50% overlap,
+    per-segment mean removal, one-sided density scaling (units^2 / Hz).
+    """
+
+    def __init__(self,
+                 fs: float,
+                 nperseg: int = 1024,
+                 noverlap: int | None = None,
+                 spectrogram_frames: int = 0):
+        if noverlap is None:
+            noverlap = nperseg // 2
+        if nperseg < 2 or not 0 <= noverlap < nperseg:
+            raise ValueError("Need nperseg >= 2 and 0 <= noverlap < nperseg")
+
+        self.fs = fs
+        self.nperseg = nperseg
+        self.step = nperseg - noverlap
+        self.window = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(nperseg) / nperseg)
+        self.freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+
+        # one-sided density: double everything except DC (and Nyquist for even nperseg)
+        self._scale = np.full(self.freqs.size, 2.0 / (fs * np.sum(self.window**2)))
+        self._scale[0] /= 2.0
+        if nperseg % 2 == 0:
+            self._scale[-1] /= 2.0
+
+        self._tail = np.zeros(0, dtype=float)
+        self._tail_start = 0          # sample index of _tail[0]
+        self._sum = np.zeros(self.freqs.size, dtype=float)
+        self.n_segments = 0
+
+        self.frames = deque(maxlen=spectrogram_frames) if spectrogram_frames > 0 else None
+        self.frame_times = deque(maxlen=spectrogram_frames) if spectrogram_frames > 0 else None
+
+    def update(self, x: np.ndarray) -> None:
+        buf = np.concatenate([self._tail, np.asarray(x, dtype=float)])
+        if buf.size < self.nperseg:
+            self._tail = buf
+            return
+
+        # all complete segments in the buffer, transformed in one batch
+        n_seg = (buf.size - self.nperseg) // self.step + 1
+        segs = np.lib.stride_tricks.sliding_window_view(buf, self.nperseg)[::self.step][:n_seg]
+        segs = segs - segs.mean(axis=1, keepdims=True)
+        P = np.abs(np.fft.rfft(segs * self.window, axis=1))**2 * self._scale
+
+        self._sum += P.sum(axis=0)
+        self.n_segments += n_seg
+
+        if self.frames is not None:
+            # copy only the rows the deque keeps; views would pin the whole batch
+            m = min(n_seg, self.frames.maxlen)
+            starts = self._tail_start + self.step * np.arange(n_seg - m, n_seg)
+            self.frames.extend(P[-m:].copy())
+            self.frame_times.extend((starts + 0.5 * self.nperseg) / self.fs)
+
+        consumed = n_seg * self.step
+        self._tail = buf[consumed:].copy()
+        self._tail_start += consumed
+
+    def psd(self) -> np.ndarray:
+        if self.n_segments == 0:
+            return np.full(self.freqs.size, np.nan)
+        return self._sum / self.n_segments
+
+    def spectrogram(self):
+        # (segment centre times relative to the first sample, freqs, power[time, freq])
+        if self.frames is None:
+            raise ValueError("spectrogram_frames was 0; no spectrogram is kept")
+        return np.array(self.frame_times), self.freqs, np.array(self.frames).reshape(-1, self.freqs.size)
+
+
+class SpectralMonitor:
+    """
+    One WelchPSD per named channel, fed with dicts of trajectory chunks.
+    """
+
+    def __init__(self, channels, fs: float, **welch_kwargs):
+        self.channels = tuple(channels)
+        self.welch = {name: WelchPSD(fs, **welch_kwargs) for name in self.channels}
+        self.n_samples = 0
+
+    def update(self, chunk: dict) -> None:
+        for name in self.channels:
+            self.welch[name].update(chunk[name])
+        self.n_samples += len(chunk[self.channels[0]])
+
+    @property
+    def freqs(self) -> np.ndarray:
+        return self.welch[self.channels[0]].freqs
+
+    def psd(self, name: str) -> np.ndarray:
+        return self.welch[name].psd()
+
+    def spectrogram(self, name: str):
+        return self.welch[name].spectrogram()
+
+
+def stream_spectra(p: Params,
+                   channels=("theta", "omega", "E"),
+                   chunk_size: int = 10_000,
+                   **welch_kwargs):
+    """
+    Run the core model chunk by chunk, yielding (t_last, monitor) after each
+    chunk so spectra can be inspected while the run progresses.
+    """
+    monitor = SpectralMonitor(channels, 1.0 / p.dt, **welch_kwargs)
+    for t, theta, omega, E in simulate_chunks(p, chunk_size):
+        monitor.update({"theta": theta, "omega": omega, "E": E})
+        yield t[-1], monitor
+
+
+def stream_spectra_3d(p: Params3D,
+                      channels=("x", "y", "theta", "E"),
+                      chunk_size: int = 10_000,
+                      **welch_kwargs):
+    """
+    Same as stream_spectra for the spherical pendulum.
+    Available channels: theta, phi, theta_dot, phi_dot, x, y, z, E.
+    """
+    monitor = SpectralMonitor(channels, 1.0 / p.dt, **welch_kwargs)
+    for t, theta, phi, theta_dot, phi_dot, x, y_, z in simulate_3d_chunks(p, chunk_size):
+        chunk = {"theta": theta, "phi": phi, "theta_dot": theta_dot, "phi_dot": phi_dot,
+                 "x": x, "y": y_, "z": z}
+        if "E" in channels:
+            chunk["E"] = energy_spherical(theta, theta_dot, phi_dot, p)
+        monitor.update(chunk)
+        yield t[-1], monitor
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+from src.core import Params, derivs, energy
+from src.streaming import RunningStats, RunningHistogram
+
+
+# Stochastically forced pendulum (thermal noise on omega):
+#   dtheta = omega dt
+#   domega = [-(g/L) sin(theta) - 2 gamma omega + A cos(wd t)] dt + sigma dW
+# Integrated with the stochastic Heun scheme (strong order 1 for additive noise).
+# The state may be a single path, shape (2,), or a batch, shape (2, n_paths).
+
+
+@dataclass(frozen=True)
+class MonteCarloResult:
+    t: np.ndarray
+    n_paths: int
+    theta_mean: np.ndarray
+    theta_var: np.ndarray
+    E_mean: np.ndarray
+    E_var: np.ndarray
+    # histograms of the final state (theta wrapped into [-pi, pi));
+    # samples outside the edges are counted in the *_underflow / *_overflow fields
+    theta_edges: np.ndarray
+    theta_hist: np.ndarray
+    theta_underflow: int
+    theta_overflow: int
+    E_edges: np.ndarray
+    E_hist: np.ndarray
+    E_underflow: int
+    E_overflow: int
+
+
+def heun_step(t: float, y: np.ndarray, dt: float, p: Params, dw: np.ndarray) -> np.ndarray:
+    # dw: noise increment on omega, sigma * sqrt(dt) * N(0, 1)
+    noise = np.zeros_like(y)
+    noise[1] = dw
+    k1 = derivs(t, y, p)
+    y_pred = y + dt*k1 + noise
+    k2 = derivs(t + dt, y_pred, p)
+    return y + 0.5*dt*(k1 + k2) + noise
+
+
+def simulate_stochastic(p: Params, sigma: float, rng: np.random.Generator | None = None):
+    """
+    Single realisation of the noisy pendulum on the same time grid as `simulate`.
+    """
+    if p.project_every:
+        raise ValueError("Invariant projection is not supported here (need project_every = 0)")
+    rng = np.random.default_rng() if rng is None else rng
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    t = np.linspace(0.0, p.t_max, n)
+    scale = sigma * np.sqrt(p.dt)
+
+    y = np.zeros((n, 2), dtype=float)
+    y[0, 0] = p.theta0
+    y[0, 1] = p.omega0
+
+    for i in range(n - 1):
+        y[i+1] = heun_step(t[i], y[i], p.dt, p, scale * rng.standard_normal())
+
+    theta = y[:, 0]
+    omega = y[:, 1]
+    E = energy(theta, omega, p)
+    return t, theta, omega, E
+
+
+def monte_carlo(p: Params,
+                sigma: float,
+                n_paths: int,
+                batch_size: int = 10_000,
+                seed: int | None = None,
+                theta_edges: np.ndarray | None = None,
+                E_edges: np.ndarray | None = None) -> MonteCarloResult:
+    """
+    Integrate `n_paths` realisations in vectorized batches.
+    Paths are never stored: mean/variance of theta and E at every time step,
+    and histograms of the final state only, are accumulated on the fly, so memory
+    is O(n_steps + batch_size) rather than O(n_steps * n_paths).
+    """
+    if p.project_every:
+        raise ValueError("Invariant projection is not supported here (need project_every = 0)")
+    if n_paths < 1 or batch_size < 1:
+        raise ValueError("n_paths and batch_size must be positive")
+
+    rng = np.random.default_rng(seed)
+    n = int(np.floor(p.t_max / p.dt)) + 1
+    t = np.linspace(0.0, p.t_max, n)
+    scale = sigma * np.sqrt(p.dt)
+
+    if theta_edges is None:
+        theta_edges = np.linspace(-np.pi, np.pi, 65)
+    if E_edges is None:
+        E_edges = np.linspace(0.0, 4.0 * p.g * p.L, 65)
+
+    theta_stats = RunningStats(n)
+    E_stats = RunningStats(n)
+    theta_hist = RunningHistogram(theta_edges)
+    E_hist = RunningHistogram(E_edges)
+
+    # per-batch, per-step summaries merged into the running stats once per batch
+    th_mean = np.empty(n)
+    th_m2 = np.empty(n)
+    E_mean = np.empty(n)
+    E_m2 = np.empty(n)
+
+    def record(i, y):
+        th = y[0]
+        E = energy(y[0], y[1], p)
+        th_mean[i] = th.mean()
+        th_m2[i] = ((th - th_mean[i])**2).sum()
+        E_mean[i] = E.mean()
+        E_m2[i] = ((E - E_mean[i])**2).sum()
+
+    done = 0
+    while done < n_paths:
+        b = min(batch_size, n_paths - done)
+        y = np.empty((2, b), dtype=float)
+        y[0] = p.theta0
+        y[1] = p.omega0
+        record(0, y)
+
+        for i in range(n - 1):
+            y = heun_step(t[i], y, p.dt, p, scale * rng.standard_normal(b))
+            record(i + 1, y)
+
+        theta_stats.merge(b, th_mean, th_m2)
+        E_stats.merge(b, E_mean, E_m2)
+        theta_hist.update(np.mod(y[0] + np.pi, 2.0 * np.pi) - np.pi)
+        E_hist.update(energy(y[0], y[1], p))
+        done += b
+
+    return MonteCarloResult(
+        t=t,
+        n_paths=n_paths,
+        theta_mean=theta_stats.mean,
+        theta_var=theta_stats.var,
+        E_mean=E_stats.mean,
+        E_var=E_stats.var,
+        theta_edges=theta_hist.edges,
+        theta_hist=theta_hist.counts,
+        theta_underflow=theta_hist.underflow,
+        theta_overflow=theta_hist.overflow,
+        E_edges=E_hist.edges,
+        E_hist=E_hist.counts,
+        E_underflow=E_hist.underflow,
+        E_overflow=E_hist.overflow,
+    )
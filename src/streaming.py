@@ -0,0 +1,73 @@
+from __future__ import annotations
+import numpy as np
+
+
+class RunningStats:
+    """
+    Streaming mean/variance (Welford, merged batch-wise with Chan's update).
+    Samples are fed along axis 0; the statistics keep the remaining shape,
+    so memory does not grow with the number of samples seen.
+    """
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape, dtype=float)
+        self.m2 = np.zeros(shape, dtype=float)
+
+    def merge(self, n: int, mean: np.ndarray, m2: np.ndarray) -> None:
+        # combine with a batch summarised by (count, mean, sum of squared deviations)
+        if n == 0:
+            return
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta**2 * (self.count * n / total)
+        self.count = total
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float)
+        n = x.shape[0]
+        if n == 0:
+            return
+        mean = x.mean(axis=0)
+        m2 = ((x - mean) ** 2).sum(axis=0)
+        self.merge(n, mean, m2)
+
+    @property
+    def var(self) -> np.ndarray:
+        # unbiased sample variance
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def sem(self) -> np.ndarray:
+        # standard error of the mean
+        return np.sqrt(self.var / max(self.count, 1))
+
+
+class RunningHistogram:
+    """
+    Fixed-bin histogram accumulated over batches.
+    Samples outside the edges are counted in `underflow` / `overflow`.
+    """
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.ravel(np.asarray(x, dtype=float))
+        counts, _ = np.histogram(x, bins=self.edges)
+        self.counts += counts
+        self.underflow += int(np.count_nonzero(x < self.edges[0]))
+        self.overflow += int(np.count_nonzero(x > self.edges[-1]))
+
+    def density(self) -> np.ndarray:
+        # normalised over all samples seen (including out-of-range ones)
+        total = self.counts.sum() + self.underflow + self.overflow
+        if total == 0:
+            return np.zeros(self.counts.shape, dtype=float)
+        return self.counts / (total * np.diff(self.edges))